@@ -10,6 +10,8 @@ from multiprocessing import Manager, Lock
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import glob
 
+from group_records import RecordAppender, dedup_records, iter_records, load_record_ids
+
 # Ensure script directory is the working directory for relative paths
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -85,42 +87,23 @@ def load_curl_worker_files():
     for file_path in worker_files:
         print(f"  📁 {os.path.basename(file_path)}")
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if content:
-                    # Handle both JSON array and JSONL formats
-                    if content.startswith('['):
-                        # JSON array format
-                        groups = json.loads(content)
-                        all_groups.extend(groups)
-                        print(f"    ✅ Loaded {len(groups)} groups (JSON array format)")
-                    else:
-                        # JSONL format
-                        file_groups = []
-                        for line in content.split('\n'):
-                            if line.strip():
-                                try:
-                                    group = json.loads(line)
-                                    file_groups.append(group)
-                                except json.JSONDecodeError:
-                                    continue
-                        all_groups.extend(file_groups)
-                        print(f"    ✅ Loaded {len(file_groups)} groups (JSONL format)")
-                else:
-                    print(f"    ⚠️  File is empty")
+            # Handles both JSONL and JSON array formats
+            file_groups = list(iter_records(file_path))
+            all_groups.extend(file_groups)
+            if file_groups:
+                print(f"    ✅ Loaded {len(file_groups)} groups")
+            else:
+                print(f"    ⚠️  File is empty")
         except Exception as e:
             print(f"    ❌ Error reading {file_path}: {e}")
     
-    # Remove duplicates based on group ID
-    unique_groups = {}
-    for group in all_groups:
-        if "id" in group:
-            unique_groups[str(group["id"])] = group
+    # Remove duplicates based on group ID (first occurrence wins)
+    unique_groups = list(dedup_records(all_groups))
     
     print(f"📊 Total groups loaded: {len(all_groups)}")
     print(f"📊 Unique groups (after deduplication): {len(unique_groups)}")
     
-    return list(unique_groups.values())
+    return unique_groups
 
 # --- Load all cookie files ---
 def load_all_cookie_files():
@@ -510,18 +493,8 @@ def process_group_worker(group_data, worker_assignment, proxies, doc_id_param):
 
 # --- Load already enriched IDs ---
 def load_enriched_ids():
-    enriched_ids = set()
-    if os.path.exists(OUTPUT_FILE):
-        with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    group = json.loads(line)
-                    if "id" in group:
-                        # Ensure ID is converted to string for consistent comparison
-                        enriched_ids.add(str(group["id"]))
-                except Exception:
-                    continue
-    return enriched_ids
+    # IDs come back as strings for consistent comparison
+    return load_record_ids(OUTPUT_FILE)
 
 # --- Main enrichment loop ---
 def main():
@@ -565,7 +538,7 @@ def main():
     print(f"\n🚀 Starting parallel processing with {num_workers} total workers...")
     print(f"📁 Output will be saved to: {OUTPUT_FILE}")
     
-    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+    with RecordAppender(OUTPUT_FILE) as appender, ThreadPoolExecutor(max_workers=num_workers) as executor:
         # Submit all tasks, cycling through worker assignments
         future_to_group = {}
         for idx, group in enumerate(groups_to_process):
@@ -614,8 +587,7 @@ def main():
                     
                     # Thread-safe writing to output file
                     with output_lock:
-                        with open(OUTPUT_FILE, "a", encoding="utf-8") as out:
-                            out.write(json.dumps(enriched_group, ensure_ascii=False) + "\n")
+                        appender.append(enriched_group)
                     
                     # Show enrichment details
                     search_term = group.get('search_term', 'Unknown')
@@ -10,6 +10,8 @@ from multiprocessing import Manager, Lock
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import glob
 
+from group_records import RecordAppender, dedup_records, iter_records, load_record_ids
+
 # Ensure script directory is the working directory for relative paths
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -76,40 +78,21 @@ def load_initial_searches_data():
     print(f"🔍 Loading initial searches from: {INITIAL_SEARCHES_FILE}")
     
     try:
-        with open(INITIAL_SEARCHES_FILE, 'r', encoding='utf-8') as f:
-            content = f.read().strip()
-            if not content:
-                print("⚠️  File is empty")
-                return []
-            
-            # Handle both JSON array and JSONL formats
-            if content.startswith('['):
-                # JSON array format
-                groups = json.loads(content)
-                print(f"✅ Loaded {len(groups)} groups (JSON array format)")
-            else:
-                # JSONL format
-                groups = []
-                for line in content.split('\n'):
-                    if line.strip():
-                        try:
-                            group = json.loads(line)
-                            groups.append(group)
-                        except json.JSONDecodeError:
-                            continue
-                print(f"✅ Loaded {len(groups)} groups (JSONL format)")
-            
-            # Remove duplicates based on group ID
-            unique_groups = {}
-            for group in groups:
-                if "id" in group:
-                    unique_groups[str(group["id"])] = group
-            
-            print(f"📊 Total groups loaded: {len(groups)}")
-            print(f"📊 Unique groups (after deduplication): {len(unique_groups)}")
-            
-            return list(unique_groups.values())
-            
+        # Handles both JSONL and JSON array formats
+        groups = list(iter_records(INITIAL_SEARCHES_FILE))
+        if not groups:
+            print("⚠️  File is empty")
+            return []
+        print(f"✅ Loaded {len(groups)} groups")
+        
+        # Remove duplicates based on group ID (first occurrence wins)
+        unique_groups = list(dedup_records(groups))
+        
+        print(f"📊 Total groups loaded: {len(groups)}")
+        print(f"📊 Unique groups (after deduplication): {len(unique_groups)}")
+        
+        return unique_groups
+        
     except Exception as e:
         print(f"❌ Error reading {INITIAL_SEARCHES_FILE}: {e}")
         return []
@@ -502,18 +485,8 @@ def process_group_worker(group_data, worker_assignment, proxies, doc_id_param):
 
 # --- Load already enriched IDs ---
 def load_enriched_ids():
-    enriched_ids = set()
-    if os.path.exists(OUTPUT_FILE):
-        with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    group = json.loads(line)
-                    if "id" in group:
-                        # Ensure ID is converted to string for consistent comparison
-                        enriched_ids.add(str(group["id"]))
-                except Exception:
-                    continue
-    return enriched_ids
+    # IDs come back as strings for consistent comparison
+    return load_record_ids(OUTPUT_FILE)
 
 # --- Main enrichment loop ---
 def main():
@@ -557,7 +530,7 @@ def main():
     print(f"\n🚀 Starting parallel processing with {num_workers} total workers...")
     print(f"📁 Output will be saved to: {OUTPUT_FILE}")
     
-    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+    with RecordAppender(OUTPUT_FILE) as appender, ThreadPoolExecutor(max_workers=num_workers) as executor:
         # Submit all tasks, cycling through worker assignments
         future_to_group = {}
         for idx, group in enumerate(groups_to_process):
@@ -606,8 +579,7 @@ def main():
                     
                     # Thread-safe writing to output file
                     with output_lock:
-                        with open(OUTPUT_FILE, "a", encoding="utf-8") as out:
-                            out.write(json.dumps(enriched_group, ensure_ascii=False) + "\n")
+                        appender.append(enriched_group)
                     
                     # Show enrichment details
                     search_term = group.get('search_term', 'Unknown')
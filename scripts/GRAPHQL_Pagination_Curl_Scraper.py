@@ -18,6 +18,10 @@ from pathlib import Path
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from profiling_hooks import profile_stage, profile_session
+from atomic_io import atomic_write_json, load_json_with_fallback
+from group_records import RecordAppender, dedup_records, iter_records
+
 # Configuration
 MAX_CONCURRENT_SEARCHES_PER_WORKER = 4  # Number of search terms to process in parallel per worker
 
@@ -57,8 +61,7 @@ class CityProgress:
     """Track progress for each unique city"""
     city: str
     urls_processed: List[str]     # List of URLs processed for this city
-    total_groups_found: int        # Total groups found across all URLs for this city
-    unique_groups: List[str]       # List of unique group IDs found for this city
+    total_groups_found: int        # Groups appended for this city; not unique across restarts or workers (exact unique counts come from rollup_city_state.py)
     last_updated: str              # ISO timestamp
     status: str                    # "active", "completed"
 
@@ -264,14 +267,14 @@ def extract_search_term_from_url(url: str) -> str:
         print(f"⚠️  Error extracting search term from URL {url}: {e}")
         return "default"
 
+@profile_stage("progress.load_progress")
 def load_progress() -> Dict[str, SearchProgress]:
     """Load scraping progress from file"""
     if not os.path.exists(PROGRESS_FILE):
         return {}
     
     try:
-        with open(PROGRESS_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_json_with_fallback(PROGRESS_FILE)
         
         progress = {}
         for key, item in data.items():
@@ -284,6 +287,7 @@ def load_progress() -> Dict[str, SearchProgress]:
         print(f"⚠️  Error loading progress: {e}")
         return {}
 
+@profile_stage("progress.save_progress")
 def save_progress(progress: Dict[str, SearchProgress], output_lock=None):
     """Save scraping progress to file"""
     try:
@@ -295,23 +299,21 @@ def save_progress(progress: Dict[str, SearchProgress], output_lock=None):
         # Use lock if provided (for multiprocessing safety)
         if output_lock:
             with output_lock:
-                with open(PROGRESS_FILE, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
+                atomic_write_json(PROGRESS_FILE, data, snapshot=True)
         else:
-            with open(PROGRESS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            atomic_write_json(PROGRESS_FILE, data, snapshot=True)
         
     except Exception as e:
         print(f"⚠️  Error saving progress: {e}")
 
+@profile_stage("progress.load_url_detailed_progress")
 def load_url_detailed_progress() -> Dict[str, URLProgress]:
     """Load detailed URL progress from file"""
     if not os.path.exists(URL_DETAILED_PROGRESS_FILE):
         return {}
     
     try:
-        with open(URL_DETAILED_PROGRESS_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_json_with_fallback(URL_DETAILED_PROGRESS_FILE)
         
         progress = {}
         for key, item in data.items():
@@ -324,6 +326,7 @@ def load_url_detailed_progress() -> Dict[str, URLProgress]:
         print(f"⚠️  Error loading detailed URL progress: {e}")
         return {}
 
+@profile_stage("progress.save_url_detailed_progress")
 def save_url_detailed_progress(progress: Dict[str, URLProgress], output_lock=None):
     """Save detailed URL progress to file"""
     try:
@@ -335,26 +338,26 @@ def save_url_detailed_progress(progress: Dict[str, URLProgress], output_lock=Non
         # Use lock if provided (for multiprocessing safety)
         if output_lock:
             with output_lock:
-                with open(URL_DETAILED_PROGRESS_FILE, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
+                atomic_write_json(URL_DETAILED_PROGRESS_FILE, data, snapshot=True)
         else:
-            with open(URL_DETAILED_PROGRESS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            atomic_write_json(URL_DETAILED_PROGRESS_FILE, data, snapshot=True)
         
     except Exception as e:
         print(f"⚠️  Error saving detailed URL progress: {e}")
 
+@profile_stage("progress.load_city_progress")
 def load_city_progress() -> Dict[str, CityProgress]:
     """Load city progress from file"""
     if not os.path.exists(CITY_PROGRESS_FILE):
         return {}
     
     try:
-        with open(CITY_PROGRESS_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_json_with_fallback(CITY_PROGRESS_FILE)
         
         progress = {}
         for key, item in data.items():
+            # Older state files carry a per-city group ID list; counts now come from the rollup stage
+            item.pop('unique_groups', None)
             progress[key] = CityProgress(**item)
         
         print(f"📊 Loaded city progress for {len(progress)} cities")
@@ -364,6 +367,7 @@ def load_city_progress() -> Dict[str, CityProgress]:
         print(f"⚠️  Error loading city progress: {e}")
         return {}
 
+@profile_stage("progress.save_city_progress")
 def save_city_progress(progress: Dict[str, CityProgress], output_lock=None):
     """Save city progress to file"""
     try:
@@ -375,25 +379,27 @@ def save_city_progress(progress: Dict[str, CityProgress], output_lock=None):
         # Use lock if provided (for multiprocessing safety)
         if output_lock:
             with output_lock:
-                with open(CITY_PROGRESS_FILE, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
+                atomic_write_json(CITY_PROGRESS_FILE, data, snapshot=True)
         else:
-            with open(CITY_PROGRESS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            atomic_write_json(CITY_PROGRESS_FILE, data, snapshot=True)
         
     except Exception as e:
         print(f"⚠️  Error saving city progress: {e}")
 
-def extract_city_from_search_term(search_term: str) -> str:
-    """Extract city from search term like 'Bettles, AK' -> 'Bettles'"""
+def split_search_term(search_term: str) -> Tuple[str, str]:
+    """Split search term like 'Bettles, AK' -> ('Bettles', 'AK')"""
     if not search_term or search_term == "Unknown":
-        return "Unknown"
+        return "Unknown", "Unknown"
     
-    # Split by comma and take the first part (city)
-    parts = search_term.split(',')
-    if len(parts) >= 1:
-        return parts[0].strip()
-    return search_term.strip()
+    # First part is the city, second (if any) the state
+    parts = [part.strip() for part in search_term.split(',')]
+    city = parts[0] or "Unknown"
+    state = parts[1].upper() if len(parts) >= 2 and parts[1] else "Unknown"
+    return city, state
+
+def extract_city_from_search_term(search_term: str) -> str:
+    """Extract city from search term like 'Bettles, AK' -> 'Bettles'"""
+    return split_search_term(search_term)[0]
 
 def ensure_output_directory():
     """Ensure the output directory exists"""
@@ -425,6 +431,7 @@ def setup_logging():
         logger = logging.getLogger()
         
         # Override print function to also log (with emoji filtering for file output)
+        @profile_stage("logging.log_print")
         def log_print(*args, **kwargs):
             try:
                 # Convert all arguments to strings and join them
@@ -456,8 +463,7 @@ def load_url_progress() -> Dict[str, bool]:
         return {}
     
     try:
-        with open(URL_PROGRESS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_json_with_fallback(URL_PROGRESS_FILE)
     except Exception as e:
         print(f"⚠️  Error loading URL progress: {e}")
         return {}
@@ -466,8 +472,7 @@ def save_url_progress(url_progress: Dict[str, bool]):
     """Save URL completion progress"""
     try:
         os.makedirs(OUTPUT_DIR, exist_ok=True)
-        with open(URL_PROGRESS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(url_progress, f, indent=2, ensure_ascii=False)
+        atomic_write_json(URL_PROGRESS_FILE, url_progress, snapshot=True)
     except Exception as e:
         print(f"⚠️  Error saving URL progress: {e}")
 
@@ -496,6 +501,7 @@ def get_worker_output_file(worker_id: Optional[int] = None) -> str:
     else:
         return OUTPUT_FILE
 
+@profile_stage("output.append_group_safe")
 def append_group_safe(group: Dict, worker_id: Optional[int] = None):
     """Safely append a group to the output file"""
     try:
@@ -504,9 +510,9 @@ def append_group_safe(group: Dict, worker_id: Optional[int] = None):
         # Ensure output directory exists
         os.makedirs(OUTPUT_DIR, exist_ok=True)
         
-        # Append group to worker-specific file
-        with open(output_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(group, ensure_ascii=False) + '\n')
+        # Append group to worker-specific file, terminating a torn final line left by a crash
+        with RecordAppender(output_file) as appender:
+            appender.append(group)
         
         # Debug: Write to debug file
         if worker_id is not None:
@@ -521,6 +527,7 @@ def append_group_safe(group: Dict, worker_id: Optional[int] = None):
             with open(debug_file, 'a', encoding='utf-8') as f:
                 f.write(f"ERROR saving group: {e}\n")
 
+@profile_session("merge")
 def merge_worker_output_files():
     """Merge all worker output files into main output file with proper deduplication"""
     print("🔄 Merging worker output files...")
@@ -532,22 +539,18 @@ def merge_worker_output_files():
     existing_groups = []
     if os.path.exists(OUTPUT_FILE):
         try:
-            with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
-                existing_data = json.load(f)
-                if isinstance(existing_data, list):
-                    existing_groups = existing_data
-                    print(f"📁 Loaded {len(existing_groups)} existing groups from main output")
-                else:
-                    print("⚠️  Main output file is not in expected array format, starting fresh")
+            existing_data = load_json_with_fallback(OUTPUT_FILE)
+            if isinstance(existing_data, list):
+                existing_groups = existing_data
+                print(f"📁 Loaded {len(existing_groups)} existing groups from main output")
+            else:
+                print("⚠️  Main output file is not in expected array format, starting fresh")
         except Exception as e:
             print(f"⚠️  Error reading existing main output: {e}, starting fresh")
     
     # Add existing groups to our collection
-    for group in existing_groups:
-        group_id = group.get("id")
-        if group_id and group_id not in seen_ids:
-            all_groups.append(group)
-            seen_ids.add(group_id)
+    for group in dedup_records(existing_groups, seen_ids):
+        all_groups.append(group)
     
     print(f"📊 Starting with {len(all_groups)} groups from existing main output")
     
@@ -560,20 +563,10 @@ def merge_worker_output_files():
     for worker_file in worker_files:
         try:
             worker_groups = 0
-            with open(worker_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        try:
-                            group = json.loads(line)
-                            group_id = group.get("id")
-                            if group_id and group_id not in seen_ids:
-                                all_groups.append(group)
-                                seen_ids.add(group_id)
-                                new_groups_from_workers += 1
-                                worker_groups += 1
-                        except json.JSONDecodeError:
-                            continue
+            for group in dedup_records(iter_records(worker_file), seen_ids):
+                all_groups.append(group)
+                new_groups_from_workers += 1
+                worker_groups += 1
             
             print(f"   📁 {os.path.basename(worker_file)}: {worker_groups} new groups")
             
@@ -581,8 +574,7 @@ def merge_worker_output_files():
             print(f"⚠️  Error reading worker file {worker_file}: {e}")
     
     # Save merged results
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(all_groups, f, indent=2, ensure_ascii=False)
+    atomic_write_json(OUTPUT_FILE, all_groups, snapshot=True)
     
     print(f"✅ Merge complete:")
     print(f"   • Total groups: {len(all_groups):,}")
@@ -660,6 +652,7 @@ class FacebookGraphQLScraper:
             self.account_failure_counts[account_name] = 0
             print(f"✅ SUCCESS: {account_name} failure count reset (was {old_count}/3)")
     
+    @profile_stage("progress.update_city_progress")
     def update_city_progress(self, city: str, url: str, group_id: str, search_term: str):
         """Update city progress tracking when a new group is found"""
         if city not in self.city_progress:
@@ -667,7 +660,6 @@ class FacebookGraphQLScraper:
                 city=city,
                 urls_processed=[],
                 total_groups_found=0,
-                unique_groups=[],
                 last_updated=datetime.datetime.now().isoformat(),
                 status="active"
             )
@@ -678,10 +670,9 @@ class FacebookGraphQLScraper:
         if url not in city_prog.urls_processed:
             city_prog.urls_processed.append(url)
         
-        # Add group ID if not already found
-        if group_id not in city_prog.unique_groups:
-            city_prog.unique_groups.append(group_id)
-            city_prog.total_groups_found += 1
+        # A running count of appended groups: seen_groups starts empty on every start and is
+        # per worker, so a group found again after a resume or by another worker counts again
+        city_prog.total_groups_found += 1
         
         # Update timestamp
         city_prog.last_updated = datetime.datetime.now().isoformat()
@@ -689,6 +680,7 @@ class FacebookGraphQLScraper:
         # Save city progress
         save_city_progress(self.city_progress, self.output_lock)
     
+    @profile_stage("progress.update_url_progress")
     def update_url_progress(self, url: str, search_term: str, city: str, group_id: str, account_name: str):
         """Update detailed URL progress tracking"""
         if url not in self.url_progress:
@@ -892,6 +884,7 @@ class FacebookGraphQLScraper:
             self.record_account_failure(account_name, error_msg)
             return None
     
+    @profile_stage("extraction.extract_groups")
     def extract_groups(self, response: Dict, search_term: str) -> List[Dict]:
         """Extract group data from GraphQL response"""
         groups = []
@@ -1109,6 +1102,7 @@ class FacebookGraphQLScraper:
             save_progress(self.progress, self.output_lock)
             return True  # Not a failure, just reached end
     
+    @profile_stage("output.save_groups")
     def save_groups(self, groups: List[Dict], url: str, search_term: str):
         """Save groups to JSON file immediately with enhanced progress tracking"""
         if not groups:
@@ -1225,8 +1219,7 @@ class FacebookGraphQLScraper:
             'city_progress': {
                 'total_cities': len(self.city_progress),
                 'total_groups_found': sum(p.total_groups_found for p in self.city_progress.values()),
-                'cities_with_groups': sum(1 for p in self.city_progress.values() if p.total_groups_found > 0),
-                'total_unique_groups': sum(len(p.unique_groups) for p in self.city_progress.values())
+                'cities_with_groups': sum(1 for p in self.city_progress.values() if p.total_groups_found > 0)
             }
         }
         
@@ -1264,11 +1257,12 @@ class FacebookGraphQLScraper:
         print(f"\n🏙️  CITY PROGRESS:")
         print(f"   • Total cities tracked: {stats['city_progress']['total_cities']:,}")
         print(f"   • Cities with groups: {stats['city_progress']['cities_with_groups']:,}")
-        print(f"   • Total groups found: {stats['city_progress']['total_groups_found']:,}")
-        print(f"   • Total unique groups: {stats['city_progress']['total_unique_groups']:,}")
+        print(f"   • Groups appended (not unique): {stats['city_progress']['total_groups_found']:,}")
+        print(f"   • Exact unique group counts per city/state: python scripts/rollup_city_state.py")
         
         print("=" * 60)
 
+@profile_session("worker")
 def worker_process(worker_id: int, account_name: str, search_terms: List[Tuple[str, str]], output_lock):
     """Worker process to handle a specific account and search terms"""
     debug_file = os.path.join(OUTPUT_DIR, f"worker_{worker_id}_debug.txt")
@@ -1825,6 +1819,7 @@ def show_final_status(search_terms: List[Tuple[str, str]], curl_files: List[Dict
     
     print("=" * 80)
 
+@profile_session("main")
 def main():
     print("🚀 Facebook Groups GraphQL Scraper - Advanced cURL Edition")
     print("🎯 Workers will process ALL URLs until completion")
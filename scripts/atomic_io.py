@@ -0,0 +1,120 @@
+import os
+import json
+import stat
+import time
+import hashlib
+import datetime
+import tempfile
+from typing import Any, Optional
+
+# Snapshots hold the last known-good copy of a state file next to it as <path>.snapshot.
+# Saves can run once per found group, so snapshots are rate-limited per path.
+SNAPSHOT_SUFFIX = ".snapshot"
+SNAPSHOT_INTERVAL = 60  # Minimum seconds between snapshots of the same file
+
+_last_snapshot_times = {}
+
+# mkstemp creates files as 0600; new files get the mode a plain open() would give them.
+# Read once at import because os.umask() can only be queried by setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def _fsync_directory(directory: str):
+    """Flush a directory entry so a completed rename survives a crash (no-op where unsupported)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def atomic_write_bytes(path: str, payload: bytes, fsync: bool = True):
+    """Write payload to path via temp file + fsync + rename so readers never see a partial file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        # os.replace keeps the temp file's mode, so carry over the existing file's instead
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    if fsync:
+        _fsync_directory(directory)
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = 2, snapshot: bool = False, fsync: bool = True):
+    """Atomically replace path with data as JSON, optionally refreshing its checksummed snapshot"""
+    payload = json.dumps(data, indent=indent, ensure_ascii=False).encode('utf-8')
+    atomic_write_bytes(path, payload, fsync)
+
+    if snapshot:
+        now = time.monotonic()
+        last = _last_snapshot_times.get(path)
+        if last is None or now - last >= SNAPSHOT_INTERVAL:
+            write_snapshot(path, payload, fsync)
+            _last_snapshot_times[path] = now
+
+def write_snapshot(path: str, payload: bytes, fsync: bool = True):
+    """Store payload as the last good snapshot of path, prefixed by a one-line checksum header"""
+    header = {
+        "sha256": hashlib.sha256(payload).hexdigest(),
+        "bytes": len(payload),
+        "created_at": datetime.datetime.now().isoformat()
+    }
+    header_line = json.dumps(header).encode('utf-8') + b"\n"
+    atomic_write_bytes(path + SNAPSHOT_SUFFIX, header_line + payload, fsync)
+
+def read_snapshot(path: str) -> Optional[bytes]:
+    """Return the snapshot payload for path if it exists and its checksum matches, else None"""
+    snapshot_path = path + SNAPSHOT_SUFFIX
+    if not os.path.exists(snapshot_path):
+        return None
+
+    with open(snapshot_path, 'rb') as f:
+        header_line = f.readline()
+        payload = f.read()
+
+    try:
+        header = json.loads(header_line)
+    except ValueError:
+        return None
+
+    if header.get("bytes") != len(payload) or header.get("sha256") != hashlib.sha256(payload).hexdigest():
+        return None
+    return payload
+
+def load_json_with_fallback(path: str) -> Any:
+    """Load JSON from path, falling back to its last good snapshot if the live file is corrupt.
+
+    Raises the original decode error when there is no usable snapshot.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError as e:
+        payload = read_snapshot(path)
+        if payload is None:
+            raise
+        print(f"⚠️  {os.path.basename(path)} is corrupt ({e}), restored last good snapshot")
+        return json.loads(payload.decode('utf-8'))
@@ -0,0 +1,286 @@
+import json
+import os
+import sys
+import time
+import argparse
+import datetime
+import platform
+import tempfile
+import tracemalloc
+from typing import Dict, Tuple
+
+import atomic_io
+import GRAPHQL_Pagination_Curl_Scraper as scraper
+from GRAPHQL_Pagination_Curl_Scraper import SearchProgress, URLProgress, CityProgress
+
+try:
+    import resource  # Not available on Windows
+except ImportError:
+    resource = None
+
+# File paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PARENT_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
+BENCHMARK_DIR = os.path.join(PARENT_DIR, "output", "benchmarks")
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, "progress_io_baseline.json")
+
+# Synthetic state sizes (number of URLs)
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SIZES = ["10k", "100k", "1m"]
+
+GROUPS_PER_URL = 3        # Group IDs recorded per URL
+URLS_PER_CITY = 10        # URLs that share a city
+UPDATES_PER_RUN = 3       # Single-group updates timed per state file
+ACCOUNTS = ["account_a", "account_b", "account_c"]
+
+# (name, loader, saver, state key, path attribute on the scraper module)
+STATE_FILES = [
+    ("progress", scraper.load_progress, scraper.save_progress, "search", "PROGRESS_FILE"),
+    ("url_detailed_progress", scraper.load_url_detailed_progress, scraper.save_url_detailed_progress, "url", "URL_DETAILED_PROGRESS_FILE"),
+    ("city_progress", scraper.load_city_progress, scraper.save_city_progress, "city", "CITY_PROGRESS_FILE"),
+]
+
+def generate_synthetic_state(num_urls: int) -> Dict[str, Dict]:
+    """Build search, URL and city progress dicts shaped like a real run with num_urls URLs"""
+    now = datetime.datetime.now().isoformat()
+    search_progress = {}
+    url_progress = {}
+    city_progress = {}
+
+    for i in range(num_urls):
+        city = f"City{i // URLS_PER_CITY}"
+        search_term = f"{city}, ST"
+        url = f"https://www.facebook.com/groups/search/groups/?q={city}%2C%20ST&n={i}"
+        group_ids = [str(100000000000000 + i * GROUPS_PER_URL + g) for g in range(GROUPS_PER_URL)]
+        account_name = ACCOUNTS[i % len(ACCOUNTS)]
+
+        search_progress[f"{search_term}::{account_name}::{i}"] = SearchProgress(
+            search_term=search_term,
+            url=url,
+            completed_accounts=[account_name],
+            failed_accounts=[],
+            last_cursor=None,
+            total_groups_found=len(group_ids),
+            zero_result_count=3,
+            last_updated=now,
+            status="completed"
+        )
+
+        url_progress[url] = URLProgress(
+            url=url,
+            search_term=search_term,
+            city=city,
+            completed_accounts=[account_name],
+            failed_accounts=[],
+            last_cursor=None,
+            total_groups_found=len(group_ids),
+            zero_result_count=0,
+            last_updated=now,
+            status="completed",
+            groups_found=group_ids
+        )
+
+        if city not in city_progress:
+            city_progress[city] = CityProgress(
+                city=city,
+                urls_processed=[],
+                total_groups_found=0,
+                last_updated=now,
+                status="active"
+            )
+        city_prog = city_progress[city]
+        city_prog.urls_processed.append(url)
+        city_prog.total_groups_found += len(group_ids)
+
+    return {"search": search_progress, "url": url_progress, "city": city_progress}
+
+def apply_single_update(state: Dict, step: int):
+    """Mutate one entry the way a single found group does during scraping"""
+    entry = next(iter(state.values()))
+    if isinstance(entry, URLProgress):
+        entry.groups_found.append(f"update_{step}")
+    entry.total_groups_found += 1
+    entry.last_updated = datetime.datetime.now().isoformat()
+
+def set_next_snapshot(path: str, write: bool):
+    """Decide whether the next save of path refreshes its snapshot, independent of wall-clock timing.
+
+    Savers rate-limit snapshots per path, so without this a timed save may or may
+    not also write a full-size copy depending on how long earlier saves took.
+    """
+    if write:
+        atomic_io._last_snapshot_times.pop(path, None)
+    else:
+        atomic_io._last_snapshot_times[path] = time.monotonic()
+
+def timed(func, *args) -> Tuple[object, float]:
+    """Run func and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def traced_peak(func, *args) -> int:
+    """Run func under tracemalloc and return its peak traced allocation in bytes.
+
+    Kept separate from timed() because tracing slows allocation-heavy code
+    such as json.dump by several times.
+    """
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+def get_max_rss_bytes() -> int:
+    """Process-wide peak resident set size, or 0 where unsupported"""
+    if resource is None:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+def benchmark_size(label: str, num_urls: int) -> Dict:
+    """Benchmark every progress loader/saver against synthetic state of one size"""
+    print(f"\n🧪 Generating synthetic state: {label} ({num_urls:,} URLs)...")
+    start = time.perf_counter()
+    state = generate_synthetic_state(num_urls)
+    print(f"   Generated in {time.perf_counter() - start:.2f}s")
+
+    results = {"num_urls": num_urls, "files": {}}
+
+    for name, loader, saver, state_key, path_attr in STATE_FILES:
+        path = getattr(scraper, path_attr)
+        file_state = state[state_key]
+
+        # Plain saves, the common case; snapshot refreshes are measured separately below
+        set_next_snapshot(path, False)
+        _, save_seconds = timed(saver, file_state)
+        file_bytes = os.path.getsize(path)
+
+        loaded, load_seconds = timed(loader)
+        if len(loaded) != len(file_state):
+            print(f"⚠️  {name}: loaded {len(loaded):,} entries, expected {len(file_state):,}")
+        del loaded
+
+        set_next_snapshot(path, False)
+        save_peak = traced_peak(saver, file_state)
+        load_peak = traced_peak(loader)
+
+        # A save that also refreshes the snapshot writes the file twice
+        set_next_snapshot(path, True)
+        _, snapshot_save_seconds = timed(saver, file_state)
+        snapshot_bytes = os.path.getsize(path + atomic_io.SNAPSHOT_SUFFIX)
+
+        # Every update rewrites the whole file, so bytes per update is the file size
+        update_seconds = []
+        update_bytes = []
+        for step in range(UPDATES_PER_RUN):
+            apply_single_update(file_state, step)
+            set_next_snapshot(path, False)
+            _, seconds = timed(saver, file_state)
+            update_seconds.append(seconds)
+            update_bytes.append(os.path.getsize(path))
+
+        results["files"][name] = {
+            "entries": len(file_state),
+            "file_bytes": file_bytes,
+            "save_seconds": round(save_seconds, 4),
+            "save_peak_traced_bytes": save_peak,
+            "load_seconds": round(load_seconds, 4),
+            "load_peak_traced_bytes": load_peak,
+            "update_seconds_avg": round(sum(update_seconds) / len(update_seconds), 4),
+            "bytes_written_per_update": int(sum(update_bytes) / len(update_bytes)),
+            "snapshot_save_seconds": round(snapshot_save_seconds, 4),
+            "snapshot_bytes": snapshot_bytes,
+        }
+
+        stats = results["files"][name]
+        print(f"   📁 {name}: {stats['entries']:,} entries, {file_bytes / 1_048_576:.1f} MB")
+        print(f"      • save: {save_seconds:.3f}s (peak {save_peak / 1_048_576:.1f} MB traced)")
+        print(f"      • load: {load_seconds:.3f}s (peak {load_peak / 1_048_576:.1f} MB traced)")
+        print(f"      • per update: {stats['update_seconds_avg']:.3f}s, {stats['bytes_written_per_update']:,} bytes written")
+        print(f"      • save with snapshot refresh: {snapshot_save_seconds:.3f}s, {snapshot_bytes:,} snapshot bytes")
+
+        os.remove(path)
+        os.remove(path + atomic_io.SNAPSHOT_SUFFIX)
+
+    del state
+    results["max_rss_bytes"] = get_max_rss_bytes()
+    return results
+
+def compare_to_baseline(results: Dict, baseline_path: str):
+    """Print the ratio of each timing/size metric against a stored baseline"""
+    if not os.path.exists(baseline_path):
+        print(f"⚠️  No baseline found at {baseline_path}")
+        return
+
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    print(f"\n📊 COMPARISON AGAINST BASELINE ({baseline.get('created_at', 'unknown date')}):")
+    print("=" * 60)
+    for label, size_results in results["sizes"].items():
+        base_size = baseline.get("sizes", {}).get(label)
+        if not base_size:
+            print(f"   {label}: not present in baseline")
+            continue
+        for name, stats in size_results["files"].items():
+            base_stats = base_size["files"].get(name)
+            if not base_stats:
+                continue
+            print(f"   {label} / {name}:")
+            for metric in ("save_seconds", "load_seconds", "update_seconds_avg",
+                           "save_peak_traced_bytes", "load_peak_traced_bytes", "bytes_written_per_update",
+                           "snapshot_save_seconds", "snapshot_bytes"):
+                old = base_stats.get(metric)
+                new = stats[metric]
+                if old:
+                    print(f"      • {metric}: {old} -> {new} ({new / old:.2f}x)")
+    print("=" * 60)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark progress file loaders and savers on synthetic state")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=DEFAULT_SIZES,
+                        help="Synthetic state sizes to run (default: all)")
+    parser.add_argument("--output", default=BASELINE_FILE,
+                        help="Where to write the JSON results")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="Compare results against an existing baseline JSON file")
+    args = parser.parse_args()
+
+    print("🚀 Progress Loader/Saver Benchmark")
+    print("=" * 60)
+
+    results = {
+        "created_at": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "groups_per_url": GROUPS_PER_URL,
+        "urls_per_city": URLS_PER_CITY,
+        "sizes": {}
+    }
+
+    with tempfile.TemporaryDirectory(prefix="progress_bench_") as work_dir:
+        # Point the scraper's state files at the scratch directory
+        scraper.OUTPUT_DIR = work_dir
+        for _, _, _, _, path_attr in STATE_FILES:
+            setattr(scraper, path_attr, os.path.join(work_dir, os.path.basename(getattr(scraper, path_attr))))
+        # Snapshots are only written when set_next_snapshot() asks for one, even if a 1M save outlasts the real interval
+        atomic_io.SNAPSHOT_INTERVAL = float("inf")
+
+        for label in args.sizes:
+            results["sizes"][label] = benchmark_size(label, SIZES[label])
+
+    if args.compare:
+        compare_to_baseline(results, args.compare)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n📁 Benchmark results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
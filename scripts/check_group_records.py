@@ -0,0 +1,189 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List, Optional
+
+from group_records import RecordAppender, dedup_records, iter_records
+
+# File paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PHP_HARNESS = os.path.join(SCRIPT_DIR, "php", "group_records_conformance.php")
+
+DEFAULT_BENCHMARK_RECORDS = 100_000
+DUPLICATE_EVERY = 10  # Every Nth benchmark record repeats an earlier ID
+
+# Raw input lines (bytes, so they can hold invalid UTF-8) exercising the edge cases of the format contract
+CONFORMANCE_INPUT_LINES = [
+    b'{"id": "1", "name": "Caf\\u00e9 \\u2615 Lovers", "url": "https:\\/\\/www.facebook.com\\/groups\\/1\\/"}',
+    b'',
+    b'{"id":"2","name":"Quotes \\" and backslash \\\\ and tab \\t","member_count":1234}',
+    b'{"id":"8","name":"Caf\xc3',
+    b'not json at all',
+    b'{"id": 3, "name": "Numeric id", "privacy": null, "enriched": true}',
+    b'{"id": "3", "name": "Duplicate of numeric id as string"}',
+    b'["an", "array", "line"]',
+    b'{"name": "Missing id"}',
+    b'{"id": "", "name": "Empty id"}',
+    b'{"id": "4", "name": "Line\\u2028separator and control \\u0001 and emoji \\ud83d\\ude00", "tags": [], "extra": {}}',
+    b'{"id": "5", "nested": {"members": {"count": 12, "list": [1, 2, {"x": "y"}]}, "empty": {}}, "search_term": "Bettles, AK"}',
+    b'   {"id": "6", "name": "Surrounding whitespace"}   ',
+    b'\x00\x0b\t{"id": "6", "name": "Duplicate with PHP trim() whitespace"}\r',
+    b'\xc2\xa0{"id": "9", "name": "Leading no-break space is not JSON whitespace"}',
+    b'{"id": "10", "name": "Trailing line separator"}\xe2\x80\xa8',
+    b'{"id": "11", "name": "Lone surrogate \\ud83d escape"}',
+    b'{"id": "12", "name": "Reversed pair \\ude00\\ud83d"}',
+    b'{"id": "13", "score": NaN}',
+    b'{"id": "14", "ratio": -Infinity}',
+    b'{"id": "1", "name": "Duplicate of first record"}',
+    b'{"id": "7", "name": "Torn line without newline"',
+]
+CONFORMANCE_EXPECTED_IDS = ["1", "2", "3", "4", "5", "6"]
+# Existing output ends in a line torn inside "é"; writers must start the next record on a new line
+EXISTING_OUTPUT = b'{"id":"0","name":"Already written"}\n{"id":"torn","name":"Caf\xc3'
+
+def run_python(input_path: str, output_path: str) -> Dict:
+    """Dedup input into output with the Python reader/writer"""
+    start = time.perf_counter()
+    count = 0
+    with RecordAppender(output_path) as appender:
+        for record in dedup_records(iter_records(input_path)):
+            appender.append(record)
+            count += 1
+    return {"records": count, "seconds": time.perf_counter() - start}
+
+def run_php(php: str, input_path: str, output_path: str) -> Dict:
+    """Dedup input into output with the PHP reader/writer"""
+    result = subprocess.run([php, PHP_HARNESS, input_path, output_path],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def check_conformance(work_dir: str, php: Optional[str]) -> List[str]:
+    """Run the edge-case fixture through both implementations and return a list of failures"""
+    failures = []
+    input_path = os.path.join(work_dir, "conformance_input.jsonl")
+    with open(input_path, 'wb') as f:
+        f.write(b"\n".join(CONFORMANCE_INPUT_LINES))
+
+    outputs = {}
+    runners = [("python", run_python)]
+    if php:
+        runners.append(("php", lambda i, o: run_php(php, i, o)))
+
+    for name, runner in runners:
+        output_path = os.path.join(work_dir, f"conformance_output_{name}.jsonl")
+        with open(output_path, 'wb') as f:
+            f.write(EXISTING_OUTPUT)
+        runner(input_path, output_path)
+        with open(output_path, 'rb') as f:
+            outputs[name] = f.read()
+
+        data = outputs[name]
+        if not data.startswith(EXISTING_OUTPUT + b"\n"):
+            failures.append(f"{name}: torn final line was not terminated before appending")
+        lines = data[len(EXISTING_OUTPUT) + 1:].decode('utf-8').split("\n")
+        if lines[-1] != "":
+            failures.append(f"{name}: output does not end with a newline")
+        records = [json.loads(line) for line in lines[:-1]]
+        ids = [str(record["id"]) for record in records]
+        if ids != CONFORMANCE_EXPECTED_IDS:
+            failures.append(f"{name}: expected IDs {CONFORMANCE_EXPECTED_IDS}, got {ids}")
+        for line in lines[:-1]:
+            # Re-encoding a conformant line with the contract settings must reproduce it exactly
+            if line != json.dumps(json.loads(line), ensure_ascii=False, separators=(',', ':')):
+                failures.append(f"{name}: line is not encoded per the contract: {line}")
+
+    if "php" in outputs and outputs["php"] != outputs["python"]:
+        failures.append("python and php outputs differ on the conformance fixture")
+    return failures
+
+def generate_benchmark_input(path: str, num_records: int):
+    """Write num_records realistic group lines, with periodic duplicate IDs"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for i in range(num_records):
+            group_id = 100000000000000 + (i // 2 if i % DUPLICATE_EVERY == 0 else i)
+            record = {
+                "id": str(group_id),
+                "name": f"Group {i} – Bettles Community Café",
+                "url": f"https://www.facebook.com/groups/{group_id}/",
+                "member_count": i * 7 % 100000,
+                "privacy": "Public" if i % 3 else "Private",
+                "search_term": "Bettles, AK",
+                "scraped_at": "2025-07-15T12:34:56.789012"
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def run_benchmark(work_dir: str, php: Optional[str], num_records: int) -> List[str]:
+    """Time both implementations on a synthetic file and return a list of failures"""
+    failures = []
+    input_path = os.path.join(work_dir, "benchmark_input.jsonl")
+    generate_benchmark_input(input_path, num_records)
+    input_bytes = os.path.getsize(input_path)
+
+    print(f"\n⏱️  Benchmark: {num_records:,} records, {input_bytes / 1_048_576:.1f} MB input")
+    outputs = {}
+    runners = [("python", run_python)]
+    if php:
+        runners.append(("php", lambda i, o: run_php(php, i, o)))
+
+    for name, runner in runners:
+        output_path = os.path.join(work_dir, f"benchmark_output_{name}.jsonl")
+        stats = runner(input_path, output_path)
+        with open(output_path, 'rb') as f:
+            outputs[name] = f.read()
+        seconds = stats["seconds"]
+        print(f"   • {name}: {stats['records']:,} records written in {seconds:.3f}s "
+              f"({num_records / seconds:,.0f} records/s, {input_bytes / 1_048_576 / seconds:.1f} MB/s read)")
+
+    if "php" in outputs and outputs["php"] != outputs["python"]:
+        failures.append("python and php outputs differ on the benchmark input")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Check Python and PHP group record readers/writers against the JSONL format contract")
+    parser.add_argument("--records", type=int, default=DEFAULT_BENCHMARK_RECORDS,
+                        help="Number of records in the throughput benchmark (0 to skip)")
+    parser.add_argument("--php", default=shutil.which("php"),
+                        help="PHP binary (default: php on PATH)")
+    parser.add_argument("--python-only", action="store_true",
+                        help="Check only the Python implementation; byte-identity with PHP is not verified")
+    args = parser.parse_args()
+    if args.python_only:
+        args.php = None
+
+    print("🚀 Group Record Format Conformance")
+    print("=" * 60)
+    if args.php:
+        print(f"🐘 PHP: {args.php}")
+    elif args.python_only:
+        print("⚠️  --python-only: checking the Python implementation only")
+    else:
+        print("⚠️  PHP not found, checking the Python implementation only")
+
+    with tempfile.TemporaryDirectory(prefix="group_records_") as work_dir:
+        failures = check_conformance(work_dir, args.php)
+        if args.records > 0:
+            failures += run_benchmark(work_dir, args.php, args.records)
+
+    if failures:
+        print(f"\n❌ {len(failures)} conformance failures:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+
+    if not args.php:
+        print("\n⚠️  SKIPPED: byte-identity with PHP not verified; Python checks passed")
+        if not args.python_only:
+            # Without PHP the main requirement of the contract is unchecked, so do not report success
+            print("❌ PHP not found (install PHP 7.4+, pass --php, or pass --python-only to skip on purpose)")
+            sys.exit(2)
+        return
+
+    print("\n✅ All conformance checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import tempfile
+from typing import List
+
+from rollup_city_state import build_rollups, parse_member_count
+
+# (group fields, expected member count) covering enriched text and the scraper's placeholder 0
+MEMBER_COUNT_CASES = [
+    ({"hovercard_member_count": "1,234 members", "member_count": 0}, 1234),
+    ({"hovercard_member_count": "12K members", "member_count": 0}, 12000),
+    ({"hovercard_member_count": "1.2M members"}, 1200000),
+    ({"hovercard_member_count": "1 member"}, 1),
+    ({"hovercard_member_count": "Private group", "member_count": 57}, 57),
+    ({"hovercard_member_count": None, "member_count": "2,500"}, 2500),
+    ({"member_count": 0}, None),
+    ({"member_count": True}, None),
+    ({}, None),
+]
+
+# Rollup fixture: the placeholder-0 group must not pull the minimum or quantiles down to 0
+ROLLUP_RECORDS = [
+    {"id": "1", "search_term": "Bettles, AK", "hovercard_member_count": "1,234 members", "member_count": 0},
+    {"id": "2", "search_term": "Bettles, AK", "hovercard_member_count": "12K members", "member_count": 0},
+    {"id": "3", "search_term": "Bettles, AK", "member_count": 0},
+    {"id": "1", "search_term": "Bettles, AK", "member_count": 0},
+]
+EXPECTED_CITY_ROW = {
+    "city": "Bettles", "state": "AK", "unique_groups": 3, "groups_with_member_count": 2,
+    "member_count_sum": 13234, "member_count_min": 1234, "member_count_max": 12000,
+}
+
+def check_member_counts() -> List[str]:
+    """Return a list of failures for parse_member_count"""
+    failures = []
+    for group, expected in MEMBER_COUNT_CASES:
+        actual = parse_member_count(group)
+        if actual != expected:
+            failures.append(f"parse_member_count({group}): expected {expected}, got {actual}")
+    return failures
+
+def check_rollup() -> List[str]:
+    """Build a rollup from the fixture and return a list of failures"""
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="rollup_check_") as work_dir:
+        input_path = os.path.join(work_dir, "groups.jsonl")
+        with open(input_path, 'w', encoding='utf-8') as f:
+            for record in ROLLUP_RECORDS:
+                f.write(json.dumps(record) + "\n")
+        rollups = build_rollups([input_path])
+
+    if len(rollups["cities"]) != 1:
+        return [f"expected 1 city row, got {len(rollups['cities'])}"]
+    row = rollups["cities"][0]
+    for field, expected in EXPECTED_CITY_ROW.items():
+        if row.get(field) != expected:
+            failures.append(f"city row {field}: expected {expected}, got {row.get(field)}")
+    return failures
+
+def main():
+    print("🚀 City/State Rollup Checks")
+    print("=" * 60)
+    failures = check_member_counts() + check_rollup()
+
+    if failures:
+        print(f"\n❌ {len(failures)} rollup check failures:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+
+    print("\n✅ All rollup checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Shared reader/writer for JSONL group record files.
+
+On-disk format contract (mirrored by php/group_records.php):
+
+- UTF-8 without BOM, one JSON object per line, each line terminated by "\\n".
+- Records are encoded compactly: no whitespace between tokens, non-ASCII
+  characters and "/" written unescaped (Python: ensure_ascii=False,
+  separators=(',', ':'); PHP: JSON_UNESCAPED_UNICODE | JSON_UNESCAPED_SLASHES
+  | JSON_UNESCAPED_LINE_TERMINATORS). Key order is preserved.
+- Every record has a non-empty "id"; IDs are compared as strings.
+- Values are strings, integers, booleans, null, arrays and objects.
+  Floats are outside the contract because the two languages format them
+  differently.
+- Readers skip blank lines, lines that are not valid UTF-8 or JSON and
+  lines that are not objects. Valid JSON means what PHP's json_decode
+  accepts: no NaN/Infinity literals and no lone surrogate escapes
+  ("\\ud83d" without its pair), which could not be written back out. A torn final line left by a crash, even one
+  cut inside a multi-byte character, is therefore ignored. Before parsing,
+  readers strip only the ASCII bytes PHP's trim() removes (space, \\t, \\r,
+  \\n, \\0, \\x0b), not Unicode whitespace such as U+00A0 or U+2028.
+- Writers only append. Before the first append they terminate a torn final
+  line so the next record starts on its own line.
+- Deduplication keeps the first record seen for each ID.
+
+Readers also accept a file holding a single JSON array of records (the merged
+groups_output_curl.json); such files have to be parsed whole.
+"""
+import os
+import re
+import json
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+# The bytes PHP's trim() strips; str.strip() would also drop Unicode whitespace
+LINE_WHITESPACE = b" \t\r\n\0\x0b"
+
+# Only text containing a surrogate escape needs the (slower) encodability check
+SURROGATE_ESCAPE = re.compile(r"\\u[dD][89a-fA-F]")
+
+def _reject_constant(name: str):
+    raise ValueError(f"{name} is not valid JSON")
+
+def decode_json(text: str):
+    """json.loads restricted to what PHP's json_decode accepts; raises ValueError otherwise"""
+    value = json.loads(text, parse_constant=_reject_constant)
+    if SURROGATE_ESCAPE.search(text):
+        # Paired escapes decode to one character; a lone surrogate cannot be encoded as UTF-8
+        json.dumps(value, ensure_ascii=False).encode('utf-8')
+    return value
+
+def encode_record(record: Dict) -> str:
+    """Encode one record as a contract-conformant JSONL line (including the newline)"""
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n"
+
+def iter_records(path: str) -> Iterator[Dict]:
+    """Stream records from a JSONL file, or from a JSON array file (which must be read whole)"""
+    # Binary lines split on b"\n" exactly where PHP's fgets does, and are decoded one at a time
+    # so a line torn inside a multi-byte character is skipped instead of aborting the read
+    with open(path, 'rb') as f:
+        first_byte = f.read(1)
+        while first_byte and first_byte in b" \t\r\n":
+            first_byte = f.read(1)
+        f.seek(0)
+
+        if first_byte == b'[':
+            for record in decode_json(f.read().decode('utf-8')):
+                if isinstance(record, dict):
+                    yield record
+            return
+
+        for line in f:
+            line = line.strip(LINE_WHITESPACE)
+            if not line:
+                continue
+            try:
+                record = decode_json(line.decode('utf-8'))
+            except ValueError:
+                # Covers UnicodeDecodeError, JSONDecodeError, NaN/Infinity and lone surrogates
+                continue
+            if isinstance(record, dict):
+                yield record
+
+def dedup_records(records: Iterable[Dict], seen_ids: Optional[Set[str]] = None) -> Iterator[Dict]:
+    """Yield the first record for each ID, dropping records without one; seen_ids is updated in place"""
+    if seen_ids is None:
+        seen_ids = set()
+    for record in records:
+        record_id = record.get("id")
+        if record_id is None or record_id == "":
+            continue
+        record_id = str(record_id)
+        if record_id in seen_ids:
+            continue
+        seen_ids.add(record_id)
+        yield record
+
+def load_record_ids(path: str) -> Set[str]:
+    """IDs of all records already in a file (empty if the file does not exist)"""
+    ids = set()
+    if not os.path.exists(path):
+        return ids
+    for record in iter_records(path):
+        record_id = record.get("id")
+        if record_id is not None and record_id != "":
+            ids.add(str(record_id))
+    return ids
+
+class RecordAppender:
+    """Keeps one JSONL file open for appending and writes each record as a complete, flushed line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._file = open(path, 'ab')
+        # Terminate a torn final line left by an interrupted write
+        if self._file.tell() > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write(b"\n")
+
+    def append(self, record: Dict):
+        self._file.write(encode_record(record).encode('utf-8'))
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -2,6 +2,8 @@
 // enrich_groups_with_hovercard.php
 // PHP port of enrich_groups_with_hovercard.py
 
+require_once __DIR__ . '/group_records.php';
+
 function prompt($prompt) {
     echo $prompt;
     return trim(fgets(STDIN));
@@ -17,10 +19,6 @@ function save_json($path, $data) {
     file_put_contents($path, json_encode($data, JSON_UNESCAPED_UNICODE | JSON_PRETTY_PRINT));
 }
 
-function append_jsonl($path, $obj) {
-    file_put_contents($path, json_encode($obj, JSON_UNESCAPED_UNICODE) . "\n", FILE_APPEND);
-}
-
 function random_sleep($min, $max) {
     $t = mt_rand($min * 1000, $max * 1000) / 1000.0;
     echo "Sleeping for {$t} seconds...\n";
@@ -75,17 +73,7 @@ if (!$COOKIES || !isset($COOKIES["c_user"])) {
 }
 
 function load_enriched_ids($OUTPUT_FILE) {
-    $enriched_ids = [];
-    if (file_exists($OUTPUT_FILE)) {
-        $lines = file($OUTPUT_FILE, FILE_IGNORE_NEW_LINES | FILE_SKIP_EMPTY_LINES);
-        foreach ($lines as $line) {
-            $group = json_decode($line, true);
-            if (isset($group["id"])) {
-                $enriched_ids[$group["id"]] = true;
-            }
-        }
-    }
-    return $enriched_ids;
+    return load_group_record_ids($OUTPUT_FILE);
 }
 
 function make_hovercard_variables($group_id) {
@@ -134,16 +122,13 @@ $HEADERS = [
 if (!file_exists($INPUT_FILE)) {
     exit("Input file $INPUT_FILE not found.\n");
 }
-$lines = file($INPUT_FILE, FILE_IGNORE_NEW_LINES | FILE_SKIP_EMPTY_LINES);
-$groups = [];
-foreach ($lines as $line) {
-    $groups[] = json_decode($line, true);
-}
+$input_ids = [];
+$groups = iterator_to_array(dedup_group_records(read_group_records($INPUT_FILE), $input_ids), false);
 $enriched_ids = load_enriched_ids($OUTPUT_FILE);
 echo "Skipping ".count($enriched_ids)." groups already enriched.\n";
-$enriched = [];
+$output = open_group_appender($OUTPUT_FILE);
 foreach ($groups as $idx => $group) {
-    if (isset($enriched_ids[$group["id"]])) continue;
+    if (isset($enriched_ids[(string)$group["id"]])) continue;
     $group_id = $group["id"];
     $variables = make_hovercard_variables($group_id);
     $data = [
@@ -217,8 +202,10 @@ foreach ($groups as $idx => $group) {
     }
     $hovercard = extract_hovercard_fields($result);
     $group = array_merge($group, $hovercard);
-    append_jsonl($OUTPUT_FILE, $group);
+    append_group_record($output, $group);
+    $enriched_ids[(string)$group_id] = true;
     echo "[".($idx+1)."/".count($groups)."] Enriched group $group_id: ".$group["name"]."\n";
     random_sleep($SLEEP_BETWEEN_REQUESTS[0], $SLEEP_BETWEEN_REQUESTS[1]);
 }
+fclose($output);
 echo "Done. Enriched data written to $OUTPUT_FILE\n"; 
\ No newline at end of file
@@ -2,6 +2,8 @@
 // facebook_groups_scraper.php
 // PHP port of facebook_groups_scraper.py
 
+require_once __DIR__ . '/group_records.php';
+
 function prompt($prompt) {
     echo $prompt;
     return trim(fgets(STDIN));
@@ -17,10 +19,6 @@ function save_json($path, $data) {
     file_put_contents($path, json_encode($data, JSON_UNESCAPED_UNICODE | JSON_PRETTY_PRINT));
 }
 
-function append_jsonl($path, $obj) {
-    file_put_contents($path, json_encode($obj, JSON_UNESCAPED_UNICODE) . "\n", FILE_APPEND);
-}
-
 function random_sleep($min, $max) {
     $t = mt_rand($min * 1000, $max * 1000) / 1000.0;
     echo "Sleeping for {$t} seconds...\n";
@@ -101,25 +99,32 @@ if (!$COOKIES || !isset($COOKIES["c_user"])) {
     exit("Cookie file missing or invalid.\n");
 }
 
-// --- LOAD STATE ---
-if (file_exists($STATE_FILE)) {
-    $state = load_json($STATE_FILE);
-    $cursor = $state["cursor"] ?? null;
-    $seen_ids = array_flip($state["seen_ids"] ?? []);
-} else {
-    $cursor = null;
-    $seen_ids = [];
+// Seen IDs are the saved state plus every record already in the output file, so a
+// crash between an append and the next state save does not duplicate groups.
+function load_seen_ids_php($state, $output_ids) {
+    $seen_ids = $output_ids;
+    foreach ($state["seen_ids"] ?? [] as $id) $seen_ids[(string)$id] = true;
+    return $seen_ids;
 }
 
+// --- LOAD STATE ---
+$output_ids = load_group_record_ids($OUTPUT_FILE);
+$state = file_exists($STATE_FILE) ? load_json($STATE_FILE) : [];
+$cursor = $state["cursor"] ?? null;
+$seen_ids = load_seen_ids_php($state, $output_ids);
+
 function save_state_php($cursor, $seen_ids, $STATE_FILE) {
     save_json($STATE_FILE, ["cursor" => $cursor, "seen_ids" => array_keys($seen_ids)]);
 }
 
-function append_group_php($group, &$seen_ids, $OUTPUT_FILE) {
-    if (!isset($seen_ids[$group["id"]])) {
+// Append the groups not seen yet (shared dedup: IDs compared as strings, records without an ID dropped).
+function append_groups_php($groups, &$seen_ids, $OUTPUT_FILE) {
+    $new_groups = 0;
+    foreach (dedup_group_records($groups, $seen_ids) as $group) {
         append_jsonl($OUTPUT_FILE, $group);
-        $seen_ids[$group["id"]] = true;
+        $new_groups++;
     }
+    return $new_groups;
 }
 
 // --- USER: Paste your variables JSON from DevTools below ---
@@ -260,14 +265,9 @@ foreach ($search_queries as $i => $SEARCH_TEXT) {
     $total_queries = count($search_queries);
     echo "\n==== Running search ".($i+1)."/$total_queries: $SEARCH_TEXT ====" . "\n";
     // Reset cursor and seen_ids for each search
-    if (file_exists($STATE_FILE)) {
-        $state = load_json($STATE_FILE);
-        $cursor = $state["cursor"] ?? null;
-        $seen_ids = array_flip($state["seen_ids"] ?? []);
-    } else {
-        $cursor = null;
-        $seen_ids = [];
-    }
+    $state = file_exists($STATE_FILE) ? load_json($STATE_FILE) : [];
+    $cursor = $state["cursor"] ?? null;
+    $seen_ids = load_seen_ids_php($state, $output_ids);
     $done = false;
     while (!$done) {
         echo "Fetching page with cursor: ".($cursor ?: 'null')."\n";
@@ -286,13 +286,7 @@ foreach ($search_queries as $i => $SEARCH_TEXT) {
             echo "Request failed: {$e->getMessage()}\n";
             break;
         }
-        $new_groups = 0;
-        foreach (extract_groups_php($response) as $group) {
-            if (!isset($seen_ids[$group["id"]])) {
-                append_group_php($group, $seen_ids, $OUTPUT_FILE);
-                $new_groups++;
-            }
-        }
+        $new_groups = append_groups_php(extract_groups_php($response), $seen_ids, $OUTPUT_FILE);
         save_state_php($cursor, $seen_ids, $STATE_FILE);
         echo "Added $new_groups new groups. Total: ".count($seen_ids)."\n";
         $next_cursor = get_next_cursor_php($response);
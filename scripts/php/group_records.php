@@ -0,0 +1,98 @@
+<?php
+// group_records.php
+// PHP port of group_records.py: shared JSONL group record reader/writer.
+// See group_records.py for the on-disk format contract; both implementations
+// must produce byte-identical output for the same input.
+
+const GROUP_RECORD_JSON_FLAGS = JSON_UNESCAPED_UNICODE | JSON_UNESCAPED_SLASHES | JSON_UNESCAPED_LINE_TERMINATORS;
+
+function encode_group_record($record) {
+    return json_encode($record, GROUP_RECORD_JSON_FLAGS) . "\n";
+}
+
+// Decode one line as a record. Nested objects stay stdClass so that empty
+// objects ({}) re-encode as {} rather than [].
+function decode_group_record($line) {
+    $obj = json_decode($line);
+    if (!is_object($obj)) return null;
+    return (array)$obj;
+}
+
+// Stream records from a JSONL file, or from a JSON array file (read whole).
+function read_group_records($path) {
+    $fh = fopen($path, 'rb');
+    if ($fh === false) return;
+    $first = '';
+    while (($c = fgetc($fh)) !== false) {
+        if (strpos(" \t\r\n", $c) === false) { $first = $c; break; }
+    }
+    rewind($fh);
+    if ($first === '[') {
+        $items = json_decode(stream_get_contents($fh));
+        fclose($fh);
+        if (!is_array($items)) return;
+        foreach ($items as $item) {
+            if (is_object($item)) yield (array)$item;
+        }
+        return;
+    }
+    while (($line = fgets($fh)) !== false) {
+        $line = trim($line);
+        if ($line === '') continue;
+        $record = decode_group_record($line);
+        if ($record !== null) yield $record;
+    }
+    fclose($fh);
+}
+
+// Yield the first record for each ID, dropping records without one; $seen_ids is updated in place.
+function dedup_group_records($records, &$seen_ids) {
+    foreach ($records as $record) {
+        $id = $record["id"] ?? null;
+        if ($id === null || $id === '') continue;
+        $id = (string)$id;
+        if (isset($seen_ids[$id])) continue;
+        $seen_ids[$id] = true;
+        yield $record;
+    }
+}
+
+function load_group_record_ids($path) {
+    $ids = [];
+    if (!file_exists($path)) return $ids;
+    foreach (read_group_records($path) as $record) {
+        $id = $record["id"] ?? null;
+        if ($id !== null && $id !== '') $ids[(string)$id] = true;
+    }
+    return $ids;
+}
+
+// Open a JSONL file for appending, terminating a torn final line left by an interrupted write.
+function open_group_appender($path) {
+    $dir = dirname($path);
+    if (!is_dir($dir)) mkdir($dir, 0777, true);
+    $fh = fopen($path, 'ab');
+    clearstatcache(true, $path);
+    if (filesize($path) > 0) {
+        $rh = fopen($path, 'rb');
+        fseek($rh, -1, SEEK_END);
+        $last = fread($rh, 1);
+        fclose($rh);
+        if ($last !== "\n") fwrite($fh, "\n");
+    }
+    return $fh;
+}
+
+function append_group_record($fh, $record) {
+    fwrite($fh, encode_group_record($record));
+    fflush($fh);
+}
+
+// Append to a path, keeping one open handle per file instead of reopening per record.
+function append_jsonl($path, $obj) {
+    static $handles = [];
+    if (!isset($handles[$path])) {
+        $handles[$path] = open_group_appender($path);
+    }
+    append_group_record($handles[$path], $obj);
+}
@@ -0,0 +1,22 @@
+<?php
+// group_records_conformance.php
+// Dedups a JSONL file into an output file through group_records.php.
+// Driven by scripts/check_group_records.py to compare against the Python implementation.
+
+require_once __DIR__ . '/group_records.php';
+
+if ($argc < 3) {
+    fwrite(STDERR, "Usage: php group_records_conformance.php <input.jsonl> <output.jsonl>\n");
+    exit(2);
+}
+
+$start = microtime(true);
+$seen_ids = [];
+$output = open_group_appender($argv[2]);
+$count = 0;
+foreach (dedup_group_records(read_group_records($argv[1]), $seen_ids) as $record) {
+    append_group_record($output, $record);
+    $count++;
+}
+fclose($output);
+echo json_encode(["records" => $count, "seconds" => microtime(true) - $start]) . "\n";
@@ -0,0 +1,200 @@
+import os
+import sys
+import json
+import time
+import datetime
+import threading
+import functools
+import tracemalloc
+from collections import Counter
+
+# Profiling is opt-in: set SCRAPER_PROFILE=1 or pass --profile on the command line.
+# When it is off, the decorators below return the wrapped function unchanged.
+PROFILE_ENV_VAR = "SCRAPER_PROFILE"
+if "--profile" in sys.argv:
+    # Export so multiprocessing workers inherit the switch
+    os.environ[PROFILE_ENV_VAR] = "1"
+PROFILE_ENABLED = os.environ.get(PROFILE_ENV_VAR, "").strip() not in ("", "0", "false", "no")
+
+# tracemalloc makes allocation-heavy code (json.dump) several times slower;
+# SCRAPER_PROFILE_MEMORY=0 keeps the stack samples closer to real CPU time
+PROFILE_MEMORY = os.environ.get("SCRAPER_PROFILE_MEMORY", "1").strip() not in ("", "0", "false", "no")
+SAMPLE_INTERVAL = float(os.environ.get("SCRAPER_PROFILE_INTERVAL", "0.005"))  # Seconds between stack samples
+TRACEMALLOC_FRAMES = 10   # Frames kept per allocation traceback
+TOP_ALLOCATIONS = 25      # Allocation sites listed in the tracemalloc summary
+
+# File paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PARENT_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
+PROFILE_DIR = os.environ.get("SCRAPER_PROFILE_DIR", os.path.join(PARENT_DIR, "output", "profiles"))
+
+_stage_stats = {}
+_stage_lock = threading.Lock()
+_session = None
+
+class StackSampler:
+    """Background thread that periodically samples the stacks of all other threads"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks = Counter()
+        self.sample_count = 0
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            thread_names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                frames.append(thread_names.get(thread_id, f"thread-{thread_id}"))
+                # Collapsed-stack format lists frames root first
+                self.stacks[";".join(reversed(frames))] += 1
+            self.sample_count += 1
+
+class ProfileSession:
+    """One profiling run in the current process, written out when stopped"""
+
+    def __init__(self, label: str):
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.label = label
+        self.base_path = os.path.join(PROFILE_DIR, f"{label}_{os.getpid()}_{timestamp}")
+        self.sampler = StackSampler(SAMPLE_INTERVAL)
+        self.started_tracemalloc = False
+        self.start_time = None
+
+    def start(self):
+        if PROFILE_MEMORY and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self.started_tracemalloc = True
+        self.start_time = time.perf_counter()
+        self.sampler.start()
+
+    def stop(self):
+        self.sampler.stop()
+        elapsed = time.perf_counter() - self.start_time
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+
+        # Collapsed stacks, renderable with flamegraph.pl or speedscope
+        with open(f"{self.base_path}.collapsed", 'w', encoding='utf-8') as f:
+            for stack, count in self.sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        with _stage_lock:
+            stages = {name: dict(stats) for name, stats in _stage_stats.items()}
+        with open(f"{self.base_path}_stages.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                "label": self.label,
+                "pid": os.getpid(),
+                "elapsed_seconds": round(elapsed, 4),
+                "samples": self.sampler.sample_count,
+                "sample_interval": SAMPLE_INTERVAL,
+                "stages": stages
+            }, f, indent=2)
+
+        if snapshot is not None:
+            snapshot.dump(f"{self.base_path}.tracemalloc")
+            with open(f"{self.base_path}_tracemalloc.txt", 'w', encoding='utf-8') as f:
+                for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+                    f.write(f"{stat}\n")
+
+        print(f"📈 Profile written: {self.base_path}.collapsed ({self.sampler.sample_count} samples, {elapsed:.1f}s)")
+
+def record_stage(name: str, elapsed: float, memory_growth: int):
+    """Accumulate timing and memory growth for one stage call"""
+    with _stage_lock:
+        stats = _stage_stats.get(name)
+        if stats is None:
+            stats = _stage_stats[name] = {
+                "calls": 0,
+                "total_seconds": 0.0,
+                "max_seconds": 0.0,
+                "max_memory_growth_bytes": 0
+            }
+        stats["calls"] += 1
+        stats["total_seconds"] += elapsed
+        stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+        stats["max_memory_growth_bytes"] = max(stats["max_memory_growth_bytes"], memory_growth)
+
+def _reset_after_fork():
+    """Drop the parent's session in a forked child so worker entry points start their own"""
+    global _session, _stage_lock
+    # The parent's lock may have been held by another thread at fork time
+    _stage_lock = threading.Lock()
+    _stage_stats.clear()
+    # The sampler thread does not survive fork, but tracing the parent started does
+    if _session is not None and _session.started_tracemalloc and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _session = None
+
+if PROFILE_ENABLED and hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def profile_stage(name: str):
+    """Decorator that times each call of a function under the given stage name"""
+    def decorator(func):
+        if not PROFILE_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracing = tracemalloc.is_tracing()
+            memory_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                memory_growth = tracemalloc.get_traced_memory()[0] - memory_before if tracing else 0
+                record_stage(name, elapsed, memory_growth)
+        return wrapper
+    return decorator
+
+def profile_session(label: str):
+    """Decorator for entry points: samples stacks for the whole call and writes the profile on exit.
+
+    If a session is already running in this process the call is only timed as a stage.
+    Forked children do not inherit the parent's session (see _reset_after_fork).
+    """
+    def decorator(func):
+        if not PROFILE_ENABLED:
+            return func
+
+        staged = profile_stage(label)(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            global _session
+            if _session is not None:
+                return staged(*args, **kwargs)
+
+            _session = ProfileSession(label)
+            _session.start()
+            try:
+                return staged(*args, **kwargs)
+            finally:
+                session, _session = _session, None
+                try:
+                    session.stop()
+                except Exception as e:
+                    print(f"⚠️  Error writing profile: {e}")
+        return wrapper
+    return decorator
@@ -0,0 +1,156 @@
+import os
+import re
+import glob
+import argparse
+import datetime
+from typing import Dict, List, Optional
+
+from GRAPHQL_Pagination_Curl_Scraper import OUTPUT_DIR, split_search_term
+from atomic_io import atomic_write_json
+from group_records import iter_records
+from profiling_hooks import profile_session
+
+# File paths
+ROLLUP_DIR = os.path.join(os.path.dirname(OUTPUT_DIR), "rollups")
+CITY_ROLLUP_FILE = os.path.join(ROLLUP_DIR, "city_rollup.json")
+STATE_ROLLUP_FILE = os.path.join(ROLLUP_DIR, "state_rollup.json")
+DEFAULT_INPUT_PATTERN = os.path.join(OUTPUT_DIR, "groups_output_curl_worker_*.json")
+
+QUANTILES = [0.5, 0.9, 0.99]
+
+# Facebook's formatted_count_text, as stored in hovercard_member_count: "1,234 members", "12K members", "1.2M members"
+FORMATTED_COUNT_PATTERN = re.compile(r"^\s*(\d[\d,]*(?:\.\d+)?)\s*([KkMm])?(?:\s+members?)?\s*$")
+COUNT_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+def parse_formatted_count(value: str) -> Optional[int]:
+    """Parse a formatted member count such as "1,234 members" or "12K members"; None if unrecognised"""
+    match = FORMATTED_COUNT_PATTERN.match(value)
+    if not match:
+        return None
+    number, suffix = match.groups()
+    count = float(number.replace(',', ''))
+    if suffix:
+        count *= COUNT_SUFFIXES[suffix.lower()]
+    return int(round(count))
+
+def parse_member_count(group: Dict) -> Optional[int]:
+    """Best available member count for a group, preferring enriched hovercard data"""
+    for field in ("hovercard_member_count", "member_count"):
+        value = group.get(field)
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, int):
+            count = value
+        elif isinstance(value, str):
+            count = parse_formatted_count(value)
+        else:
+            count = None
+        # The scraper stores 0 when the search result had no count, and a group always has a member
+        if count:
+            return count
+    return None
+
+def quantile(sorted_values: List[int], q: float) -> Optional[int]:
+    """Nearest-rank quantile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+def summarize(key_fields: Dict, groups: Dict[str, Optional[int]]) -> Dict:
+    """Turn one hash-aggregation bucket (group ID -> member count) into a rollup row"""
+    counts = sorted(count for count in groups.values() if count is not None)
+    row = dict(key_fields)
+    row["unique_groups"] = len(groups)
+    row["groups_with_member_count"] = len(counts)
+    row["member_count_sum"] = sum(counts)
+    row["member_count_min"] = counts[0] if counts else None
+    row["member_count_max"] = counts[-1] if counts else None
+    for q in QUANTILES:
+        row[f"member_count_p{int(q * 100)}"] = quantile(counts, q)
+    return row
+
+@profile_session("rollup")
+def build_rollups(input_paths: List[str]) -> Dict:
+    """Stream every input record once, hash-aggregating unique groups per (city, state) and per state"""
+    # Buckets map group ID -> member count so duplicates across files collapse to one entry
+    city_buckets = {}
+    state_buckets = {}
+    records = 0
+
+    for path in input_paths:
+        file_records = 0
+        try:
+            for group in iter_records(path):
+                group_id = group.get("id")
+                if not group_id:
+                    continue
+                group_id = str(group_id)
+                city, state = split_search_term(group.get("search_term", ""))
+                member_count = parse_member_count(group)
+
+                city_bucket = city_buckets.setdefault((city, state), {})
+                if city_bucket.get(group_id) is None:
+                    city_bucket[group_id] = member_count
+                state_bucket = state_buckets.setdefault(state, {})
+                if state_bucket.get(group_id) is None:
+                    state_bucket[group_id] = member_count
+
+                file_records += 1
+        except Exception as e:
+            print(f"⚠️  Error reading {path}: {e}")
+        records += file_records
+        print(f"   📁 {os.path.basename(path)}: {file_records:,} records")
+
+    cities_per_state = {}
+    for _, state in city_buckets:
+        cities_per_state[state] = cities_per_state.get(state, 0) + 1
+
+    city_rows = [summarize({"city": city, "state": state}, groups)
+                 for (city, state), groups in city_buckets.items()]
+    state_rows = [summarize({"state": state, "cities": cities_per_state[state]}, groups)
+                  for state, groups in state_buckets.items()]
+
+    city_rows.sort(key=lambda row: (-row["unique_groups"], row["state"], row["city"]))
+    state_rows.sort(key=lambda row: (-row["unique_groups"], row["state"]))
+
+    unique_groups = len(set().union(*state_buckets.values()))
+    return {"records": records, "unique_groups": unique_groups, "cities": city_rows, "states": state_rows}
+
+def main():
+    parser = argparse.ArgumentParser(description="Build per-city and per-state group rollups from scraped output")
+    parser.add_argument("inputs", nargs="*",
+                        help="JSONL or JSON array files to aggregate (default: all cURL worker output files)")
+    parser.add_argument("--output-dir", default=ROLLUP_DIR,
+                        help="Directory for city_rollup.json and state_rollup.json")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write a profile of the rollup to output/profiles (read by profiling_hooks)")
+    args = parser.parse_args()
+
+    input_paths = args.inputs or sorted(glob.glob(DEFAULT_INPUT_PATTERN))
+    if not input_paths:
+        print(f"❌ No input files found (looked for {DEFAULT_INPUT_PATTERN})")
+        return
+
+    print("🚀 City/State Rollup")
+    print("=" * 60)
+    print(f"📁 Aggregating {len(input_paths)} input files...")
+
+    rollups = build_rollups(input_paths)
+    generated_at = datetime.datetime.now().isoformat()
+
+    city_file = os.path.join(args.output_dir, os.path.basename(CITY_ROLLUP_FILE))
+    state_file = os.path.join(args.output_dir, os.path.basename(STATE_ROLLUP_FILE))
+    atomic_write_json(city_file, {"generated_at": generated_at, "inputs": input_paths, "rows": rollups["cities"]})
+    atomic_write_json(state_file, {"generated_at": generated_at, "inputs": input_paths, "rows": rollups["states"]})
+
+    print(f"\n✅ Rollup complete:")
+    print(f"   • Records read: {rollups['records']:,}")
+    print(f"   • Cities: {len(rollups['cities']):,}")
+    print(f"   • States: {len(rollups['states']):,}")
+    print(f"   • Unique groups: {rollups['unique_groups']:,}")
+    print(f"📁 City rollup: {city_file}")
+    print(f"📁 State rollup: {state_file}")
+
+if __name__ == "__main__":
+    main()